@@ -2,15 +2,20 @@
 """
 advmp.py -- MicroPython text adventure on Raspberry Pi Pico W
 Port of adv.py: immersive exploration and NPC chat via OpenAI Chat API
-Requires: MicroPython build with network, urequests, ujson
+Requires: MicroPython build with network, uasyncio (with TLS streams), ujson
 """
-import network
 import time
 import ujson
-import urequests
+import uasyncio as asyncio
+import uos
+import random
 import sys
 import wifi
 import config
+try:
+    import umsgpack
+except ImportError:
+    umsgpack = None  # history file falls back to JSON
 
 # ----------------------------------------------------------------
 # CONFIGURATION
@@ -23,16 +28,41 @@ MODEL_NAME = settings["model_name"]
 # print("API key:", API_KEY)
 # sys.exit(0)
 
-wlan = wifi.connect_wifi()
-if not wlan:
-    print("Failed to connect to Wi-Fi.")
-    sys.exit(1)
-
 # MODEL_NAME        = MODEL_NAME
-TEMPERATURE       = 0.8
-TOP_P             = 0.9
-MAX_TOKENS        = 200
-HISTORY_LIMIT     = 6
+MAX_TOKENS        = 200   # hard cap per reply; None for the server default
+TOKEN_BUDGET      = 2000  # approx. input tokens sent per request
+MAX_ATTEMPTS      = 4
+RETRY_STATUS      = (429, 500, 502, 503, 504)
+SUMMARY_KEEP      = 2   # recent messages left verbatim after a summary
+
+SUMMARY_PROMPT    = "Summarize the adventure so far in 80 tokens or fewer."
+
+NPC_LIST_PROMPT   = "List NPCs in this scene (comma-separated) or 'None'."
+NPC_TAG           = "<NPCS>"
+NPC_END_TAG       = "</NPCS>"
+
+HISTORY_FILE      = "history.bin"  # crash-recovery copy of history
+
+API_HOST          = "api.openai.com"
+API_PATH          = "/v1/chat/completions"
+
+# Everything in the request body but "messages" is fixed, so it is
+# serialized once here and spliced in after the messages on each call.
+# Sampling is left at the server defaults. SYSTEM_PROMPT asks for short
+# replies, and max_tokens enforces it so one reply can't exhaust RAM.
+_body = {"model":MODEL_NAME, "stream":True}
+if MAX_TOKENS:
+    _body["max_tokens"] = MAX_TOKENS
+_BODY_SUFFIX = ujson.dumps(_body)[1:].encode()
+del _body
+# Likewise the request line and headers; only Content-Length varies.
+_REQUEST_HEAD = (
+    f"POST {API_PATH} HTTP/1.1\r\n"
+    f"Host: {API_HOST}\r\n"
+    f"Authorization: Bearer {API_KEY}\r\n"
+    "Content-Type: application/json\r\n"
+    "Connection: keep-alive\r\n"
+).encode()
 
 # System prompt
 SYSTEM_PROMPT = (
@@ -41,133 +71,532 @@ SYSTEM_PROMPT = (
     "1) A full name and title/role. 2) A brief backstory snippet. "
     "The world is full of towns, villages, forests, cities, ruins, markets, taverns, temples, homes, travelers. "
     "Keep track of the player's location and NPCs. "
-    "When the player says 'goodbye', end an NPC conversation politely."
+    "When the player says 'goodbye', end an NPC conversation politely. "
+    "Be concise: keep every reply under 150 words. "
+    "End every scene description with one last line listing the NPCs present, "
+    "exactly in the form <NPCS>: Full Name, Full Name</NPCS> (or <NPCS>: None</NPCS>)."
 )
+# Every history starts with this one dict, and its JSON is built once, so
+# the long prompt is neither copied nor re-serialized per turn. (Freezing
+# this module into the firmware keeps the literals themselves in flash.)
+_SYSTEM_MSG = {"role":"system","content":SYSTEM_PROMPT}
+_SYSTEM_JSON = ujson.dumps(_SYSTEM_MSG).encode()
 
 # ----------------------------------------------------------------
 # UTILITY
 # ----------------------------------------------------------------
-def load_api_key(fname):
+def save_history(path, history):
+    """Write history to flash (MessagePack if available, else JSON)."""
     try:
-        with open(fname) as f:
-            return f.read().strip()
-    except:
-        print("Error: cannot read API key file.")
-        sys.exit(1)
+        if umsgpack:
+            with open(path, "wb") as f:
+                umsgpack.dump(history, f)
+        else:
+            with open(path, "w") as f:
+                ujson.dump(history, f)
+    except Exception as e:
+        print("Error saving history:", e)
 
-def wifi_connect(ssid, pwd, timeout=15):
-    wlan = network.WLAN(network.STA_IF)
-    wlan.active(True)
-    if not wlan.isconnected():
-        wlan.connect(ssid, pwd)
-        t0 = time.ticks_ms()
-        while not wlan.isconnected():
-            if time.ticks_diff(time.ticks_ms(), t0) > timeout*1000:
-                print("Wi-Fi connect failed")
-                return False
-            time.sleep(1)
-    # print("Wi-Fi IP", wlan.ifconfig()[0])
-    return True
-
-def call_openai(api_key, history):
-    # trim history
-    if len(history) > HISTORY_LIMIT:
-        history = [history[0]] + history[-(HISTORY_LIMIT-1):]
-    url = "https://api.openai.com/v1/chat/completions"
-    hdr = {"Content-Type":"application/json", "Authorization":f"Bearer {api_key}"}
-    body = {"model":MODEL_NAME, "messages":history,
-            "temperature":TEMPERATURE, "top_p":TOP_P,
-            "max_tokens":MAX_TOKENS}
+def load_history(path):
+    """Read history saved by save_history; returns None if unavailable."""
     try:
-        r = urequests.post(url, headers=hdr, data=ujson.dumps(body))
-    except Exception as e:
-        print("API error", e)
-        return None
-    if r.status_code != 200:
-        print("HTTP", r.status_code, r.text)
-        r.close()
+        if umsgpack:
+            with open(path, "rb") as f:
+                return umsgpack.load(f)
+        with open(path) as f:
+            return ujson.load(f)
+    except:
         return None
-    j = r.json(); r.close()
+
+# ----------------------------------------------------------------
+# HTTPS KEEP-ALIVE
+# ----------------------------------------------------------------
+# TLS streams to API_HOST are kept open between turns so only the
+# first request on each pays for DNS, TCP connect and the TLS handshake.
+# All I/O goes through uasyncio streams, so other tasks keep running
+# while a request is in flight. Up to MAX_CONNS idle streams are kept
+# so a second request can overlap a turn without a fresh handshake.
+MAX_CONNS = 2
+KEEPALIVE_S = 30  # how often keepalive() checks the idle streams
+IDLE_LIMIT_S = 50  # stay under the server's idle timeout (a guess)
+_idle = []  # [((reader, writer), released_ms), ...]
+
+async def _connect():
+    return await asyncio.open_connection(API_HOST, 443, ssl=True)
+
+async def _disconnect(conn):
     try:
-        return j['choices'][0]['message']['content'].strip()
+        conn[1].close()
+        await conn[1].wait_closed()
     except:
-        return None
+        pass
+
+async def _prewarm():
+    """Open a stream in the background so the next request skips the handshake."""
+    try:
+        await _release(await _connect())
+    except Exception:
+        pass  # the next request will connect (and report errors) itself
+
+async def _release(conn):
+    if len(_idle) < MAX_CONNS:
+        _idle.append((conn, time.ticks_ms()))
+    else:
+        await _disconnect(conn)
+
+async def keepalive():
+    """Keep a usable stream ready while the player is thinking.
+
+    TCP keepalive probes can't be enabled through a uasyncio TLS stream,
+    and would not stop the server's HTTP idle timeout anyway. Instead,
+    streams idle for IDLE_LIMIT_S are closed before the server drops
+    them, and a fresh one is opened here rather than on the next turn.
+    """
+    while True:
+        await asyncio.sleep(KEEPALIVE_S)
+        now = time.ticks_ms()
+        stale = [e for e in _idle
+                 if time.ticks_diff(now, e[1]) > IDLE_LIMIT_S * 1000]
+        for e in stale:
+            _idle.remove(e)  # all before the first await
+        for e in stale:
+            await _disconnect(e[0])
+        if stale and not _idle:
+            await _prewarm()
+
+async def _read_head(reader):
+    """Read status line and headers.
+
+    Returns (status, length, chunked, close, retry_after).
+    """
+    # status line, e.g. b"HTTP/1.1 200 OK"
+    line = await reader.readline()
+    if not line:
+        raise OSError("connection closed by server")
+    status = int(line.split(None, 2)[1])
+    length = None
+    chunked = False
+    close = False
+    retry_after = None
+    while True:
+        line = await reader.readline()
+        if not line or line == b"\r\n":
+            break
+        l = line.lower()
+        if l.startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+        elif l.startswith(b"transfer-encoding:") and b"chunked" in l:
+            chunked = True
+        elif l.startswith(b"connection:") and b"close" in l:
+            close = True
+        elif l.startswith(b"retry-after:"):
+            try:
+                retry_after = float(line.split(b":", 1)[1].decode())
+            except ValueError:
+                pass  # HTTP-date form; use our own backoff
+    return status, length, chunked, close, retry_after
+
+async def _read_body(reader, length, chunked, on_data):
+    """Pass the body to on_data() piece by piece as it arrives."""
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()  # blank line after the last chunk
+                break
+            on_data(await reader.readexactly(size))
+            await reader.readline()  # CRLF after each chunk
+    elif length is not None:
+        on_data(await reader.readexactly(length))
+    else:
+        # no framing: body runs until the server closes the stream
+        on_data(await reader.read(-1))
+
+async def _post(data, on_data):
+    """POST data to API_PATH over a cached stream.
+
+    A 200 body is handed to on_data() as it arrives and (200, b"", None)
+    is returned; any other status returns (status, body bytes,
+    Retry-After seconds or None).
+    """
+    req = b"".join((_REQUEST_HEAD,
+                    b"Content-Length: %d\r\n\r\n" % len(data), data))
+    for attempt in range(2):
+        reused = bool(_idle)
+        conn = _idle.pop()[0] if reused else await _connect()
+        reader, writer = conn
+        try:
+            writer.write(req)
+            await writer.drain()
+            status, length, chunked, close, retry_after = await _read_head(reader)
+        except OSError:
+            # EPIPE/ECONNRESET or an idle stream the server already closed:
+            # reconnect once, but don't retry a request on a fresh stream
+            await _disconnect(conn)
+            if reused and attempt == 0:
+                continue
+            raise
+        body = []
+        try:
+            await _read_body(reader, length, chunked,
+                             on_data if status == 200 else body.append)
+        except:
+            await _disconnect(conn)
+            raise
+        if close or (length is None and not chunked):
+            await _disconnect(conn)
+        else:
+            await _release(conn)
+        return status, b"".join(body), retry_after
+
+class _ChatStream:
+    """Collects content deltas from an SSE chat completion stream.
+
+    With echo set, text is printed as it arrives, holding back the
+    <NPCS> trailer so it never reaches the screen.
+    """
+    def __init__(self, echo):
+        self.echo = echo
+        self.pending = b""  # partial SSE line
+        self.text = ""
+        self.shown = -1     # chars of self.text echoed, -1 before any
+
+    def feed(self, data):
+        lines = (self.pending + data).split(b"\n")
+        self.pending = lines.pop()
+        for line in lines:
+            if not line.startswith(b"data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == b"[DONE]":
+                continue
+            try:
+                delta = ujson.loads(payload)["choices"][0]["delta"].get("content")
+            except:
+                continue
+            if delta:
+                self.text += delta
+                if self.echo:
+                    self._show(self._visible_end())
+
+    def _visible_end(self):
+        t = self.text
+        end = t.find(NPC_TAG)
+        if end < 0:
+            end = len(t)
+            # stop short of a tag that may still be arriving
+            for k in range(len(NPC_TAG) - 1, 0, -1):
+                if t.endswith(NPC_TAG[:k]):
+                    end -= k
+                    break
+        # trailing whitespace waits until more text follows it
+        return len(t[:end].rstrip())
+
+    def _show(self, end):
+        if self.shown < 0:
+            # skip leading blank lines, like .strip() on the full reply
+            start = len(self.text) - len(self.text.lstrip())
+            if start >= end:
+                return
+            self.shown = start
+        if end > self.shown:
+            sys.stdout.write(self.text[self.shown:end])
+            self.shown = end
+
+    def finish(self):
+        if self.echo:
+            self._show(self._visible_end())
+            sys.stdout.write("\n")
+        return self.text
+
+# ----------------------------------------------------------------
+# HISTORY
+# ----------------------------------------------------------------
+# Message dicts dropped from a history are kept here and refilled by
+# _msg(), so a turn doesn't allocate fresh dicts for the GC to chase.
+MSG_POOL = 16
+_free_msgs = []
+
+def _msg(role, content):
+    m = _free_msgs.pop() if _free_msgs else {}
+    m["role"] = role
+    m["content"] = content
+    return m
+
+def _recycle(msgs):
+    """Return dicts no longer referenced by any history to the pool."""
+    for m in msgs:
+        if len(_free_msgs) >= MSG_POOL:
+            break
+        if m is _SYSTEM_MSG:
+            continue
+        m["content"] = ""  # let the old text be collected
+        _free_msgs.append(m)
+
+_SUMMARY_MSG = {"role":"system","content":SUMMARY_PROMPT}
+_NPC_LIST_MSG = {"role":"user","content":NPC_LIST_PROMPT}
+
+# background task folding old turns into a summary, or None
+_summary_task = None
+
+async def _summarize(history):
+    """Replace history[1:-SUMMARY_KEEP] with one story-so-far message."""
+    global _summary_task
+    try:
+        n = len(history) - SUMMARY_KEEP
+        old = history[1:n]
+        summary = await call_openai([_SUMMARY_MSG] + old, summarize=False)
+        # skip if the list was cleared (abandoned) while we waited; else
+        # only appends happen meanwhile, so history[1:n] is unchanged
+        if summary and len(history) >= n and all(a is b for a, b in zip(history[1:n], old)):
+            history[1:n] = [_msg("system", "Story so far: "+summary)]
+            _recycle(old)
+    finally:
+        _summary_task = None
+
+def _dump_messages(msgs):
+    """JSON-encode msgs, splicing in the pre-encoded system prompt."""
+    if not msgs or msgs[0] is not _SYSTEM_MSG:
+        return ujson.dumps(msgs).encode()
+    if len(msgs) == 1:
+        return b"[" + _SYSTEM_JSON + b"]"
+    # "[{...},...]" -> "[<system>,{...},...]"
+    return b"[" + _SYSTEM_JSON + b"," + ujson.dumps(msgs[1:])[1:].encode()
+
+def _approx_tokens(msgs):
+    # ~4 characters per token for English text
+    return sum(len(m["content"]) >> 2 for m in msgs)
+
+async def call_openai(history, summarize=True, echo=False):
+    """Send history to the chat API; returns the reply text or None.
+
+    With echo set the reply is printed while it streams in.
+    """
+    global _summary_task
+    tokens = _approx_tokens(history)
+    if tokens >= TOKEN_BUDGET:
+        # compress older turns in the background (mutates the caller's
+        # list) and send a trimmed copy meanwhile
+        if summarize and _summary_task is None:
+            _summary_task = asyncio.create_task(_summarize(history))
+        # keep the system prompt and any story-so-far summary
+        head = 2 if len(history) > 2 and history[1]["role"] == "system" else 1
+        history = history[:]
+        while tokens >= TOKEN_BUDGET and len(history) > head + 1:
+            tokens -= len(history.pop(head)["content"]) >> 2
+    data = b'{"messages":' + _dump_messages(history) + b',' + _BODY_SUFFIX
+    for attempt in range(MAX_ATTEMPTS):
+        stream = _ChatStream(echo)
+        retry_after = None
+        try:
+            status, resp, retry_after = await _post(data, stream.feed)
+        except Exception as e:
+            # _post already dropped the broken stream; the retry reconnects
+            print("API error", e)
+            if stream.shown > 0:
+                return None  # part of the reply is on screen already
+        else:
+            if status == 200:
+                return _strip_npcs(stream.finish()).strip()
+            print("HTTP", status, resp)
+            if status not in RETRY_STATUS:
+                return None
+        if attempt < MAX_ATTEMPTS - 1:
+            # honor Retry-After, else capped exponential backoff with jitter
+            delay = retry_after or min(2 ** attempt, 8) + random.random()
+            await asyncio.sleep(delay)
+    return None
+
+# NPCs named in the trailer of the last scene reply, or None if unknown
+current_npcs = None
+
+def _strip_npcs(text):
+    """Remove the <NPCS> trailer from a reply, caching its names."""
+    global current_npcs
+    i = text.find(NPC_TAG)
+    if i < 0:
+        return text
+    names = text[i+len(NPC_TAG):]
+    j = names.find(NPC_END_TAG)
+    if j >= 0:
+        names = names[:j]
+    current_npcs = []
+    for name in names.lstrip(":").split(","):
+        name = name.strip()
+        if name and name.lower() != "none":
+            current_npcs.append(name)
+    return text[:i]
+
+# NPC listings fetched for replies without a trailer, keyed by the hash
+# of the reply; the oldest of NPC_CACHE_SIZE entries is evicted first
+NPC_CACHE_SIZE = 16
+_npc_cache = {}
+_npc_keys = []  # insertion order (MicroPython dicts are unordered)
+
+def _cache_npcs(k, names):
+    if len(_npc_keys) >= NPC_CACHE_SIZE:
+        del _npc_cache[_npc_keys.pop(0)]
+    _npc_cache[k] = names
+    _npc_keys.append(k)
+
+# ----------------------------------------------------------------
+# INPUT
+# ----------------------------------------------------------------
+_stdin = asyncio.StreamReader(sys.stdin)
+_last_eol = None
+
+async def ainput(prompt=""):
+    """Like input(), but yields to other tasks while waiting for keys."""
+    global _last_eol
+    sys.stdout.write(prompt)
+    line = ""
+    while True:
+        c = await _stdin.read(1)
+        if c in ("\r", "\n"):
+            # treat CRLF from the terminal as a single line ending
+            if c == "\n" and _last_eol == "\r" and not line:
+                _last_eol = None
+                continue
+            _last_eol = c
+            sys.stdout.write("\n")
+            return line
+        _last_eol = None
+        if c in ("\x08", "\x7f"):
+            if line:
+                line = line[:-1]
+                sys.stdout.write("\x08 \x08")
+            continue
+        line += c
+        sys.stdout.write(c)
+
+HELP_TEXT = (
+    "Commands:\n"
+    "  go to <loc>        - Move to a place\n"
+    "  examine <obj>      - Inspect people or objects\n"
+    "  talk to <name>     - Chat with an NPC\n"
+    "  talk to            - List NPCs here\n"
+    "  look               - Describe surroundings\n"
+    "  help               - Show this help\n"
+    "  quit               - Exit game"
+)
 
 def print_help():
-    print("Commands:")
-    print("  go to <loc>        - Move to a place")
-    print("  examine <obj>      - Inspect people or objects")
-    print("  talk to <name>     - Chat with an NPC")
-    print("  talk to            - List NPCs here")
-    print("  look               - Describe surroundings")
-    print("  help               - Show this help")
-    print("  quit               - Exit game")
+    print(HELP_TEXT)
 
 # ----------------------------------------------------------------
 # MAIN LOOP
 # ----------------------------------------------------------------
-def main():
-    # init history
-    history = [{"role":"system","content":SYSTEM_PROMPT}]
-    # starting context
+async def startup():
+    """Join Wi-Fi while local setup runs; returns saved history or None."""
+    # wlan.connect() runs here; the task only polls for completion, so
+    # the flash read below overlaps association and DHCP
+    wlan_task = asyncio.create_task(wifi.connect_wifi_async())
+    history = load_history(HISTORY_FILE)
+    if not await wlan_task:
+        print("Failed to connect to Wi-Fi.")
+        sys.exit(1)
+    return history
+
+async def main():
+    global current_npcs
     print("\nWelcome to the Pico Text Adventure Game!")
-    print("Setting up the world...")
-    # print("Where and when do you start?")
-    # start = input("> ").strip()
-    # if not start:
-    start = "Year 1372, Isle of Everdawn"
-    history.append({"role":"user","content":f"Begin the adventure: {start}."})
-    intro = call_openai(API_KEY, history)
-    if not intro:
-        print("Failed to set up world. This is probably a network error or unable to get data from OpenAI.")
-        return
-    print("\n"+intro)
-    history.append({"role":"assistant","content":intro})
+    # resume after a crash or power loss if a history file survived
+    history = await startup()
+    asyncio.create_task(keepalive())
+    if history:
+        print("Resuming your adventure...")
+        if history[0]["content"] == SYSTEM_PROMPT:
+            history[0] = _SYSTEM_MSG
+        # handshake with the API while the player reads the last scene
+        asyncio.create_task(_prewarm())
+        if history[-1]["role"] == "assistant":
+            print("\n"+history[-1]["content"])
+    else:
+        # init history
+        history = [_SYSTEM_MSG]
+        # starting context
+        print("Setting up the world...")
+        # print("Where and when do you start?")
+        # start = input("> ").strip()
+        # if not start:
+        start = "Year 1372, Isle of Everdawn"
+        history.append(_msg("user", f"Begin the adventure: {start}."))
+        print()
+        intro = await call_openai(history, echo=True)
+        if not intro:
+            print("Failed to set up world. This is probably a network error or unable to get data from OpenAI.")
+            return
+        history.append(_msg("assistant", intro))
+        save_history(HISTORY_FILE, history)
     print_help()
     # game REPL
     while True:
-        cmd = input("\n> ").strip()
+        cmd = (await ainput("\n> ")).strip()
         lc = cmd.lower()
         if not cmd:
             continue
         if lc in ("quit","exit"):
             print("Farewell, traveler!")
+            try:
+                uos.remove(HISTORY_FILE)
+            except OSError:
+                pass
             break
         if lc == "help":
             print_help(); continue
         # list NPCs
         if lc == "talk to":
-            # ask AI for NPC list
-            prompt = history + [{"role":"user","content":
-                "List NPCs in this scene (comma-separated) or 'None'."}]
-            names = call_openai(API_KEY, prompt)
+            if current_npcs is not None:
+                # listed in the last scene reply, no request needed
+                print(", ".join(current_npcs) or "None")
+                continue
+            # reply had no trailer: ask AI for NPC list, once per scene
+            k = hash(history[-1]["content"])
+            names = _npc_cache.get(k)
+            if names is None:
+                names = await call_openai(history + [_NPC_LIST_MSG], summarize=False)
+                if current_npcs is not None:
+                    names = ", ".join(current_npcs)
+                if names:
+                    _cache_npcs(k, names)
             print(names or "None")
             continue
         # conversation with NPC
         if lc.startswith("talk to "):
             npc = cmd[8:].strip()
             # system for NPC chat
-            sys = f"You are {npc}. Speak in first-person as yourself."
-            conv = [{"role":"system","content":sys}]
+            npc_sys = f"You are {npc}. Speak in first-person as yourself."
+            conv = [_msg("system", npc_sys)]
             print(f"Talking to {npc}. (goodbye to exit)")
             while True:
-                line = input("You: ").strip()
+                line = (await ainput("You: ")).strip()
+                if not line:
+                    continue
                 if line.lower() in ("goodbye","exit","bye"):
                     break
-                conv.append({"role":"user","content":line})
-                rep = call_openai(API_KEY, conv)
-                print(f"{npc}: {rep}")
-                conv.append({"role":"assistant","content":rep})
+                conv.append(_msg("user", line))
+                sys.stdout.write(f"{npc}: ")
+                # "Story so far" summaries are for the adventure, not chats
+                rep = await call_openai(conv, summarize=False, echo=True)
+                if rep:
+                    conv.append(_msg("assistant", rep))
+                else:
+                    _recycle([conv.pop()])  # drop the unanswered line
+            _recycle(conv)
+            conv.clear()  # so a pending _summarize can't recycle them again
             continue
         # general commands forwarded
-        history.append({"role":"user","content":cmd})
-        reply = call_openai(API_KEY, history)
+        current_npcs = None
+        history.append(_msg("user", cmd))
+        print()
+        reply = await call_openai(history, echo=True)
         if not reply:
             print("No response. Try again.")
+            _recycle([history.pop()])  # drop the unanswered command
             continue
-        print("\n"+reply)
-        history.append({"role":"assistant","content":reply})
+        history.append(_msg("assistant", reply))
+        save_history(HISTORY_FILE, history)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
 
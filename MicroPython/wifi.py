@@ -1,15 +1,27 @@
 import network
 import time
-import urequests
+import uasyncio as asyncio
 import config
 
 
-def get_external_ip():
+# external IP, fetched on first request and reused for the session
+_ext_ip = None
+
+
+async def get_external_ip():
+    global _ext_ip
+    if _ext_ip:
+        return _ext_ip
     try:
-        url = "http://checkip.amazonaws.com/"
-        response = urequests.get(url)
-        ip = response.text.strip()
-        response.close()
+        reader, writer = await asyncio.open_connection("checkip.amazonaws.com", 80)
+        writer.write(b"GET / HTTP/1.0\r\nHost: checkip.amazonaws.com\r\n\r\n")
+        await writer.drain()
+        response = await reader.read(-1)
+        writer.close()
+        await writer.wait_closed()
+        # body follows the blank line after the headers
+        ip = response.split(b"\r\n\r\n", 1)[1].decode().strip()
+        _ext_ip = ip
         print("External IP:", ip)
         return ip
     except Exception as e:
@@ -17,7 +29,7 @@ def get_external_ip():
         return None
 
 
-def connect_wifi():
+def _begin_connect():
     settings = config.read_config_settings()
 
     WIFI_SSID = settings["ssid"]
@@ -28,18 +40,48 @@ def connect_wifi():
     wlan = network.WLAN(network.STA_IF)
     wlan.active(True)
     wlan.connect(WIFI_SSID, WIFI_PASSWORD)
+    return wlan, WIFI_SSID
 
-    max_wait = 10
-    while max_wait > 0:
-        if wlan.isconnected():
-            break
-        max_wait -= 1
-        time.sleep(1)
 
+def _end_connect(wlan, ssid):
     if wlan.isconnected():
-        print('Connected to', WIFI_SSID)
+        print('Connected to', ssid)
         # print("Connection data:", wlan.ifconfig())
         return wlan
     else:
-        print('Failed to connect to', WIFI_SSID)
+        print('Failed to connect to', ssid)
         return None
+
+
+def connect_wifi():
+    wlan, ssid = _begin_connect()
+
+    # poll often so we notice association as soon as it completes
+    max_wait_ms = 10000
+    while max_wait_ms > 0:
+        if wlan.isconnected():
+            break
+        max_wait_ms -= 50
+        time.sleep_ms(50)
+
+    return _end_connect(wlan, ssid)
+
+
+def connect_wifi_async():
+    """Like connect_wifi(), but lets other tasks run while waiting.
+
+    Starts associating right away; only the wait is left to the returned
+    coroutine, so work done before awaiting it overlaps the connection.
+    """
+    return _wait_connect(*_begin_connect())
+
+
+async def _wait_connect(wlan, ssid):
+    max_wait_ms = 10000
+    while max_wait_ms > 0:
+        if wlan.isconnected():
+            break
+        max_wait_ms -= 50
+        await asyncio.sleep_ms(50)
+
+    return _end_connect(wlan, ssid)
@@ -4,35 +4,63 @@ import sys
 import time
 import json
 import random
+import re
+import asyncio
+import hashlib
+import queue
+import threading
+import zlib
+import base64
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import MutableMapping
 # On Windows, enable ANSI escape handling via colorama
 try:
     import colorama
     colorama.init(convert=True)
 except ImportError:
     pass
+# Use orjson for save files and JSON replies when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(data):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+def _loads(text):
+    return orjson.loads(text) if orjson else json.loads(text)
 
 # Utility: normalize multiline text (strip extra CRs and collapse multiple blanks)
+# A "blank" line is empty or whitespace-only; [^\S\n] is whitespace but newline.
+_LEADING_BLANKS = re.compile(r"\A(?:[^\S\n]*\n)+")
+_MULTI_BLANK = re.compile(r"\n(?:[^\S\n]*\n)+")
+# Hidden NPC details Realmweaver appends to replies (see SYSTEM_PROMPT)
+NPC_META_OPEN, NPC_META_CLOSE = "<NPC_META>", "</NPC_META>"
+# (a tag left open by a reply cut off at max_tokens runs to the end)
+_NPC_META_RE = re.compile(r"<NPC_META>(.*?)(?:</NPC_META>|\Z)", re.S)
+
 def normalize_text(text):
-    # remove CR
+    # remove CR and hidden NPC details
     text = text.replace("\r", "")
-    lines = text.split("\n")
+    if NPC_META_OPEN in text:
+        text = _NPC_META_RE.sub("", text)
+    if "\n" not in text:
+        # single line: nothing to collapse
+        return text if text.strip() else ""
+    if not text.strip():
+        return ""
     # strip leading/trailing blanks
-    while lines and not lines[0].strip():
-        lines.pop(0)
-    while lines and not lines[-1].strip():
-        lines.pop()
+    text = _LEADING_BLANKS.sub("", text)
+    # (trailing side via rstrip: an anchored regex rescans from every newline)
+    end = text.find("\n", len(text.rstrip()))
+    if end != -1:
+        text = text[:end]
     # collapse multiple blanks
-    out = []
-    blank = False
-    for line in lines:
-        if not line.strip():
-            if not blank:
-                out.append("")
-            blank = True
-        else:
-            out.append(line)
-            blank = False
-    return "\n".join(out)
+    return _MULTI_BLANK.sub("\n\n", text)
 
 # Configuration flags
 prune_enabled = True
@@ -44,18 +72,37 @@ try:
 except ImportError:
     print("[Warning] prompt_toolkit not installed; falling back to basic input().", file=sys.stderr)
     _pt_enabled = False
-from openai import OpenAI
+import importlib.util
+import httpx
+import openai
+from openai import OpenAI, AsyncOpenAI
 
 # ----------------------------------------------------------------
 # CONFIGURATION & CLIENT INIT
 # ----------------------------------------------------------------
 
-client = OpenAI()
+# Shared HTTP settings: keep connections (and their TLS sessions) open
+# between calls; use HTTP/2 when the optional h2 package is installed.
+_HTTP_OPTIONS = dict(
+    http2=importlib.util.find_spec("h2") is not None,
+    timeout=30.0,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+)
+
+# Retries are handled by _retry_delay below rather than inside the SDK
+client = OpenAI(max_retries=0, http_client=httpx.Client(**_HTTP_OPTIONS))
 client.api_key = os.getenv("OPENAI_API_KEY")
 if not client.api_key:
     print("[Error] OPENAI_API_KEY environment variable not set.", file=sys.stderr)
     sys.exit(1)
+# Async client for requests issued concurrently. It runs on one loop for
+# the whole session, since its pooled connections belong to that loop.
+aclient = AsyncOpenAI(api_key=client.api_key, max_retries=0,
+                      http_client=httpx.AsyncClient(**_HTTP_OPTIONS))
+_loop = asyncio.new_event_loop()
 MODEL_NAME = "gpt-4.1-mini"  #"gpt-3.5-turbo"
+# Placeholder returned by call_openai when the API can't be reached
+NO_RESPONSE = "[The realm is silent; no response comes.]"
 
 # Enforce naming and backstory in every NPC description
 SYSTEM_PROMPT = """
@@ -71,9 +118,84 @@ Keep track of the player's location, the NPCs you've introduced (with consistent
 and ensure continuity as they walk, examine, or speak with people and creatures.
 When the player types commands like "go to…", "examine…", or "talk to X",
 respond with a vivid, immersive description or dialogue.
+
+The first time you introduce a person, end your reply with one hidden line for them:
+<NPC_META>{"name": "<full name and title as introduced>", "bio": "<one sentence: who they are>", "backstory": "<two sentences: past, interests, or beliefs>"}</NPC_META>
+The player never sees these lines. Emit one per newly introduced person, nothing for people already introduced.
 """
 # There are no quests—only exploration, conversation, and discovery.
 
+# Static narration guide sent after SYSTEM_PROMPT. Together they exceed the
+# 1024-token minimum for OpenAI prompt caching, so this unchanging prefix
+# is billed and processed at the cached rate on every call.
+STYLE_GUIDE = """
+NARRATION STYLE GUIDE
+
+Voice and tone:
+  - Narrate in the second person and present tense ("You step into the square...").
+  - Keep the tone warm, curious, and grounded. Wonder is welcome; melodrama is not.
+  - Let the world feel lived in: people have errands, weather changes, shops open and close,
+    animals wander, and sounds drift in from beyond the current scene.
+  - Never break character to talk about being an AI, a model, or a program.
+  - Write plain text for a terminal. Do not use Markdown headings, bold, italics, tables,
+    bullet characters, or emoji. Separate paragraphs with a single blank line.
+
+Describing a scene:
+  - Open with the most striking detail, then widen to the surroundings.
+  - Touch at least two senses beyond sight: sound, smell, temperature, texture, taste.
+  - Mention the notable objects the player could examine, woven into the prose rather than
+    listed, and keep their names stable so the player can refer to them later.
+  - Make the ways onward clear: named places, doors, roads, stairs, paths, or compass
+    directions. When an exit leads somewhere already visited, use that place's name.
+  - Keep a scene to two or three short paragraphs unless the player asks for more detail.
+
+People and creatures:
+  - Introduce every person with a full name and a title or role, then one or two sentences
+    of backstory that hint at what they want, fear, or believe.
+  - Once a name is given, never change it, its spelling, or the person's role. If someone
+    reappears, describe what has changed since the player last saw them, if anything.
+  - Give each person a distinct way of speaking: word choice, rhythm, a habit or phrase.
+  - People react to the player's earlier actions and remember past conversations.
+  - Creatures have believable behavior: wary, hungry, curious, territorial, or tame.
+
+Responding to commands:
+  - "go to", "move to", "travel to", or a compass direction: describe the journey in a
+    sentence or two when it is more than a few steps, then describe the arrival scene.
+  - "look", "observe", or "where": re-describe the current location, noting anything that
+    has changed since the player arrived.
+  - "examine", "look at", or "inspect": give close detail about that one thing or person,
+    including anything hidden that a careful eye would notice.
+  - Anything else: interpret it generously as an in-world action and narrate the outcome.
+    If an action is impossible, explain why within the fiction and suggest what might work.
+  - Never take actions on the player's behalf beyond what they asked for.
+  - Never decide what the player thinks or feels; describe only what they perceive.
+
+Continuity:
+  - Track the current location, the time of day, the weather, and what the player carries.
+  - Time passes as the player travels; let morning become afternoon and evening.
+  - Places keep their layout between visits. Objects stay where they were left unless
+    someone had a reason to move them.
+  - If a summary of earlier events is provided, treat it as established fact.
+
+Objects and belongings:
+  - Describe objects by material, age, wear, and purpose, and hint at their history.
+  - Ordinary things behave ordinarily. Unusual things have limits and a cost.
+  - Shops, stalls, and traders have plausible wares and prices for the setting, and
+    haggling is welcome.
+
+Pacing and discovery:
+  - There are no quests or win conditions. Reward curiosity with small secrets, local
+    legends, odd characters, and places worth returning to.
+  - Offer gentle hooks (a rumor, a locked gate, a stranger's glance) without forcing them.
+  - Danger may exist, but keep it proportionate and avoid graphic violence.
+  - End each reply at a natural pause that invites the player's next command. Do not list
+    the available commands or ask "What do you do?" every time.
+
+Hints:
+  - When the player asks for a hint, stay in the world: a passerby's remark, a noticed
+    detail, or a half-remembered story that points toward something interesting nearby.
+"""
+
 # ----------------------------------------------------------------
 # GLOBAL NPC STORAGE
 # ----------------------------------------------------------------
@@ -81,21 +203,92 @@ respond with a vivid, immersive description or dialogue.
 # Stores npc_name -> {"bio": "...", "backstory": "...", "affinity": int}
 npc_data = {}
 
+class CompressedDict(MutableMapping):
+    """str -> str mapping that keeps its values zlib-compressed in memory."""
+    def __init__(self):
+        self._data = {}
+
+    def __getitem__(self, key):
+        return zlib.decompress(self._data[key]).decode()
+
+    def __setitem__(self, key, value):
+        self._data[key] = zlib.compress(value.encode(), 1)
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+    def dump(self):
+        """Compressed values as base64 text, for the save file."""
+        return {k: base64.b64encode(v).decode() for k, v in self._data.items()}
+
+    def restore(self, saved):
+        """Replace contents with the output of dump()."""
+        self._data = {k: base64.b64decode(v) for k, v in saved.items()}
+
 # Scene descriptions: location -> last LLM description
-scene_descriptions = {}
+scene_descriptions = CompressedDict()
 
 # Player state tracking
 player_state = {
     "stats": {},
+    "_mods": {},  # stat -> ability modifier, derived from stats
     "inventory": [],
     "journal": [],
     "visited_locations": [],
-    "map_graph": {},  # location -> set of neighbors
+    "map_graph": {},  # location -> list of neighbors
+    "_graph_version": 0,  # bumped whenever map_graph changes
     "current_location": None,
 }
 
+# Rendered map trees: location -> (graph version, ASCII tree)
+_map_cache = {}
+
 # Items database: item_name -> description
-items_data = {}
+items_data = CompressedDict()
+
+# Sorted tab-completion options; None until rebuilt after a change
+_completion_cache = None
+
+# Call after changing npc_data, items_data, inventory or visited locations
+def _invalidate_completions():
+    global _completion_cache
+    _completion_cache = None
+
+# Build (or reuse) the tab-completion option list
+def _completion_options():
+    global _completion_cache
+    if _completion_cache is None:
+        _completion_cache = tuple(sorted(set(
+            BASE_COMMANDS +
+            list(npc_data.keys()) +
+            player_state.get("inventory", []) +
+            player_state.get("visited_locations", []) +
+            list(items_data.keys()))))
+    return _completion_cache
+
+# Store NPC details from any <NPC_META> tags in a reply; returns the cleaned reply
+def _take_npc_meta(text):
+    if NPC_META_OPEN not in text:
+        return text
+    for raw in _NPC_META_RE.findall(text):
+        try:
+            meta = _loads(raw)
+            name, bio, backstory = (str(meta[k]).strip() for k in ("name", "bio", "backstory"))
+        except (ValueError, TypeError, KeyError):
+            continue
+        if name and bio and backstory and name not in npc_data:
+            npc_data[name] = {"bio": bio, "backstory": backstory}
+            _invalidate_completions()
+    return _NPC_META_RE.sub("", text)
 
 # ANSI colors
 RED = "\033[1;31m"
@@ -120,14 +313,14 @@ if _pt_enabled:
         """Dynamic tab-completion for commands, NPCs, items, and locations."""
         def get_completions(self, document, complete_event):
             word = document.get_word_before_cursor()
-            options = (BASE_COMMANDS +
-                       list(npc_data.keys()) +
-                       player_state.get("inventory", []) +
-                       player_state.get("visited_locations", []) +
-                       list(items_data.keys()))
-            for opt in options:
-                if opt.startswith(word):
-                    yield Completion(opt, start_position=-len(word))
+            options = _completion_options()
+            # matches are contiguous in the sorted options, starting at lo
+            lo = bisect_left(options, word)
+            for i in range(lo, len(options)):
+                opt = options[i]
+                if not opt.startswith(word):
+                    break
+                yield Completion(opt, start_position=-len(word))
     try:
         session = PromptSession(completer=AdventureCompleter())
     except Exception as e:
@@ -148,17 +341,28 @@ def prompt_user(prompt_text):
 # Save file path
 SAVE_FILE = "savegame.json"
 
+# Game's own random source for stats, dice and retry jitter
+_rng = random.Random()
+
+# Recompute ability modifiers; call whenever stats are replaced
+def _update_mods():
+    player_state["_mods"] = {k: (v - 10) // 2 for k, v in player_state["stats"].items()}
+
 # Initialize player stats and state for a new game
 def init_player_state():
-    stats = {s: random.randint(8, 18) for s in ("STR", "DEX", "CON", "INT", "WIS", "CHA")}
+    stats = dict(zip(("STR", "DEX", "CON", "INT", "WIS", "CHA"), _rng.choices(range(8, 19), k=6)))
     player_state.update({
         "stats": stats,
         "inventory": [],
         "journal": [],
         "visited_locations": [],
         "map_graph": {},
+        "_graph_version": 0,
         "current_location": None,
     })
+    _update_mods()
+    _map_cache.clear()
+    _invalidate_completions()
 
 # Save current game to SAVE_FILE
 def save_game(history):
@@ -166,69 +370,192 @@ def save_game(history):
         "npc_data": npc_data,
         "player_state": player_state,
         "history": history,
+        "summary": CURRENT_SUMMARY,
+        "response_cache": list(_resp_cache.items()),
+        "scene_descriptions": scene_descriptions.dump(),
+        "items_data": items_data.dump(),
     }
-    with open(SAVE_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    with open(SAVE_FILE, "w", encoding="utf-8") as f:
+        f.write(_dumps(data))
     print(f"{YELLOW}Game saved to {SAVE_FILE}.{RESET}")
 
 # Load game from SAVE_FILE; returns history or None
 def load_game():
+    global CURRENT_SUMMARY
     if not os.path.isfile(SAVE_FILE):
         print(f"{RED}No save file found.{RESET}")
         return None
-    with open(SAVE_FILE, "r") as f:
-        data = json.load(f)
+    with open(SAVE_FILE, "r", encoding="utf-8") as f:
+        data = _loads(f.read())
     npc_data.clear()
     npc_data.update(data.get("npc_data", {}))
     player_state.update(data.get("player_state", {}))
+    _update_mods()
+    scene_descriptions.restore(data.get("scene_descriptions", {}))
+    items_data.restore(data.get("items_data", {}))
+    _map_cache.clear()
+    _invalidate_completions()
+    _resp_cache.clear()
+    _resp_cache.update(data.get("response_cache", []))
+    CURRENT_SUMMARY = data.get("summary", "")
+    history = data.get("history", [])
+    # Older saves kept the system prompt and summary inside history
+    while history and history[0]["role"] == "system":
+        content = history.pop(0)["content"]
+        if content.startswith("SUMMARY: "):
+            CURRENT_SUMMARY = content[len("SUMMARY: "):]
     print(f"{YELLOW}Game loaded from {SAVE_FILE}.{RESET}")
-    return data.get("history", [])
+    return history
 
-# Prune and summarize long history to control token usage
-def prune_history(history, max_msgs=30, keep_tail=10):
-    if len(history) <= max_msgs:
-        return history
-    to_summarize = history[:-keep_tail]
+# Summary of turns pruned from history; only changes when prune_history runs
+CURRENT_SUMMARY = ""
+
+def stable_prefix():
+    """System messages that start every Realmweaver call.
+
+    They stay byte-identical between prunes so OpenAI can reuse its
+    cached prompt prefix; only the history tail after them changes.
+    """
+    prefix = [{"role": "system", "content": SYSTEM_PROMPT + STYLE_GUIDE}]
+    if CURRENT_SUMMARY:
+        prefix.append({"role": "system", "content": f"SUMMARY: {CURRENT_SUMMARY}"})
+    return prefix
+
+def build_messages(history, question=None):
+    """stable_prefix() + history tail (+ an optional trailing user question)."""
+    messages = stable_prefix() + history
+    if question:
+        messages.append({"role": "user", "content": question})
+    return messages
+
+# Background summarization: finished (summarized messages, summary) pairs
+_prune_results = queue.Queue()
+_prune_thread = None
+_last_prune_len = None
+
+def _bg_summarize(to_summarize, previous):
     prompt = [{"role": "system", "content": "Summarize the following adventure context in two sentences."}]
+    if previous:
+        prompt.append({"role": "system", "content": f"SUMMARY: {previous}"})
     prompt.extend(to_summarize)
     summary = call_openai(prompt)
-    new_history = [{"role": "system", "content": f"SUMMARY: {summary}"}] + history[-keep_tail:]
-    print(f"{YELLOW}[History pruned and summarized]{RESET}")
-    return new_history
+    if summary != NO_RESPONSE:
+        _prune_results.put((to_summarize, summary))
+
+# Token counting for prune_history: tiktoken if available, else ~4 chars/token
+try:
+    import tiktoken
+    _encoding = tiktoken.encoding_for_model(MODEL_NAME)
+except Exception:
+    _encoding = None
+
+def _approx_tokens(msgs):
+    if _encoding:
+        return sum(len(_encoding.encode(m["content"])) for m in msgs)
+    return sum(len(m["content"]) for m in msgs) // 4
+
+# Prune and summarize long history to control token usage
+def prune_history(history, max_tokens=6000, keep_tail=10):
+    """Apply a finished summary, and start a new one if history is long.
+
+    Summarization runs in a thread so the player can keep typing; the
+    summarized turns are dropped on a later call once it completes.
+    """
+    global CURRENT_SUMMARY, _prune_thread, _last_prune_len
+    try:
+        summarized, summary = _prune_results.get_nowait()
+    except queue.Empty:
+        pass
+    else:
+        n = len(summarized)
+        # history may have been replaced (e.g. by load) in the meantime
+        if len(history) >= n and all(a is b for a, b in zip(history, summarized)):
+            CURRENT_SUMMARY = summary
+            history = history[n:]
+            print(f"{YELLOW}[History pruned and summarized]{RESET}")
+    if len(history) == _last_prune_len:
+        return history
+    _last_prune_len = len(history)
+    if len(history) <= keep_tail or (_prune_thread and _prune_thread.is_alive()):
+        return history
+    if _approx_tokens(history) <= max_tokens:
+        return history
+    _prune_thread = threading.Thread(
+        target=_bg_summarize, args=(history[:-keep_tail], CURRENT_SUMMARY), daemon=True)
+    _prune_thread.start()
+    return history
+
+# Split a comma-separated reply into names, dropping punctuation and 'None'
+_LIST_STRIP = " \t\r\n.!?:;"
+
+def _parse_list(raw):
+    return _clean_names(raw.split(","))
+
+def _clean_names(entries):
+    return [name for name in (str(entry).strip(_LIST_STRIP) for entry in entries)
+            if name and name.lower() != "none"]
 
 # List items in scene via OpenAI
 def list_items(history):
-    prompt = history + [{
-        "role": "user",
-        "content": "List, in a comma-separated list, all objects present in this scene. If none, reply 'None'."
-    }]
-    raw = call_openai(prompt)
-    items = []
-    for entry in raw.split(","):
-        name = entry.strip().strip(".!?:;")
-        if name and name.lower() != "none":
-            items.append(name)
-    return items
+    prompt = build_messages(history,
+        "List, in a comma-separated list, all objects present in this scene. If none, reply 'None'.")
+    raw = cached_call_openai(prompt, cacheable=True)
+    return _parse_list(raw)
 
 # List exits in scene via OpenAI
 def list_exits(history):
-    prompt = history + [{
-        "role": "user",
-        "content": "List, in a comma-separated list, all exits or directions available from this scene. If none, reply 'None'."
-    }]
-    raw = call_openai(prompt)
-    exits = []
-    for entry in raw.split(","):
-        name = entry.strip().strip(".!?:;")
-        if name and name.lower() != "none":
-            exits.append(name)
-    return exits
+    prompt = build_messages(history,
+        "List, in a comma-separated list, all exits or directions available from this scene. If none, reply 'None'.")
+    raw = cached_call_openai(prompt, cacheable=True)
+    return _parse_list(raw)
+
+# Describe NPCs, items, and exits in scene via a single OpenAI call
+ENVIRONMENT_PROMPT = (
+    "Reply with a JSON object with three keys: \"npcs\" (the FULL NAMES of all NPCs "
+    "currently present in this scene), \"items\" (all objects present in this scene) "
+    "and \"exits\" (all exits or directions available from this scene). "
+    "Each value is a list of strings; use an empty list if there are none."
+)
+JSON_FORMAT = {"type": "json_object"}
+
+def _parse_environment(raw):
+    """Turn the JSON reply into (npcs, items, exits); None if malformed."""
+    if raw == NO_RESPONSE:
+        return [], [], []
+    try:
+        data = _loads(raw)
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        lists = [data.get(key, []) for key in ("npcs", "items", "exits")]
+        if all(isinstance(v, list) for v in lists):
+            return tuple(_clean_names(v) for v in lists)
+    return None
+
+def describe_environment(history):
+    """Return (npcs, items, exits) for the current scene."""
+    prompt = build_messages(history, ENVIRONMENT_PROMPT)
+    raw = cached_call_openai(prompt, cacheable=True, response_format=JSON_FORMAT)
+    env = _parse_environment(raw)
+    if env is None:
+        # Malformed JSON: fall back to asking for each list separately
+        env = list_npcs(history), list_items(history), list_exits(history)
+    return env
+
+async def adescribe_environment(history):
+    """Async describe_environment, to run alongside the scene description.
+
+    Returns None for a malformed reply; the blocking fallback queries are
+    left to describe_environment, after the loop is done.
+    """
+    prompt = build_messages(history, ENVIRONMENT_PROMPT)
+    raw = await acached_call_openai(prompt, cacheable=True, response_format=JSON_FORMAT)
+    return _parse_environment(raw)
 
 # Print summary of the environment: exits, NPCs, items
-def print_environment_summary(history):
-    npcs = list_npcs(history)
-    items = list_items(history)
-    exits = list_exits(history)
+def print_environment_summary(history, env=None):
+    # env is None when not fetched yet, or adescribe_environment's reply was bad
+    npcs, items, exits = env or describe_environment(history)
     print(f"{BLUE}Exits:{RESET} {', '.join(exits) or 'None'}")
     print(f"{GREEN}NPCs here:{RESET} {', '.join(npcs) or 'None'}")
     print(f"{YELLOW}Items here:{RESET} {', '.join(items) or 'None'}")
@@ -237,9 +564,45 @@ def print_environment_summary(history):
 # HELPER FUNCTIONS
 # ----------------------------------------------------------------
 
-def call_openai(messages):
+# API attempts per request, and the longest wait between two of them
+API_ATTEMPTS = 5
+MAX_BACKOFF = 20.0
+
+def _retry_delay(err, attempt):
+    """Seconds to wait before retrying after err, or None to give up.
+
+    Status errors are retried on the same terms as the SDK's own policy
+    (408, 409, 429 and 5xx, or whatever x-should-retry says) and wait for
+    the server's retry-after when it sends one; everything else backs off
+    exponentially. Both get a little jitter so concurrent requests don't
+    retry in lockstep.
+    """
+    wait = 2 ** attempt
+    if isinstance(err, openai.APIStatusError):
+        headers = err.response.headers
+        should_retry = headers.get("x-should-retry")
+        if should_retry == "true" or (should_retry != "false" and (
+                err.status_code in (408, 409, 429) or err.status_code >= 500)):
+            try:
+                wait = float(headers.get("retry-after", wait))
+            except ValueError:
+                pass
+        else:
+            # bad request, auth, not found...: retrying won't help
+            wait = None
+    elif not isinstance(err, (openai.APIConnectionError, openai.APITimeoutError)):
+        # unexpected error; retry, but don't wait long for it
+        wait = 1
+    if wait is None or attempt + 1 >= API_ATTEMPTS:
+        print(f"[Warning] API error: {err}.", file=sys.stderr)
+        return None
+    print(f"[Warning] API error: {err}. Retrying…", file=sys.stderr)
+    return min(max(wait, 0), MAX_BACKOFF) + _rng.random() * 0.3
+
+def call_openai(messages, response_format=None):
     """Call the OpenAI API with retries."""
-    for attempt in range(3):
+    extra = {"response_format": response_format} if response_format else {}
+    for attempt in range(API_ATTEMPTS):
         try:
             resp = client.chat.completions.create(
                 model=MODEL_NAME,
@@ -247,16 +610,247 @@ def call_openai(messages):
                 temperature=0.8,
                 max_tokens=500,
                 top_p=0.9,
+                **extra,
             )
             # Normalize line endings (remove carriage returns) and strip
             text = resp.choices[0].message.content.replace("\r", "")
-            return text.strip()
+            return _take_npc_meta(text).strip()
         except Exception as e:
-            print(f"[Warning] API error: {e}. Retrying…", file=sys.stderr)
-            time.sleep(1)
+            wait = _retry_delay(e, attempt)
+            if wait is None:
+                break
+            time.sleep(wait)
     # On repeated failure, return a placeholder rather than exiting
     print("[Error] Could not reach OpenAI API. Continuing with placeholder response.", file=sys.stderr)
-    return "[The realm is silent; no response comes.]"
+    return NO_RESPONSE
+
+async def acall_openai(messages, response_format=None):
+    """Async call_openai, for requests that can run concurrently."""
+    extra = {"response_format": response_format} if response_format else {}
+    for attempt in range(API_ATTEMPTS):
+        try:
+            resp = await aclient.chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                temperature=0.8,
+                max_tokens=500,
+                top_p=0.9,
+                **extra,
+            )
+            text = resp.choices[0].message.content.replace("\r", "")
+            return _take_npc_meta(text).strip()
+        except Exception as e:
+            wait = _retry_delay(e, attempt)
+            if wait is None:
+                break
+            await asyncio.sleep(wait)
+    print("[Error] Could not reach OpenAI API. Continuing with placeholder response.", file=sys.stderr)
+    return NO_RESPONSE
+
+# ----------------------------------------------------------------
+# RESPONSE CACHE
+# ----------------------------------------------------------------
+
+# LRU cache of replies to enumeration queries: key of recent messages -> reply
+RESPONSE_CACHE_MAX = 256
+_resp_cache = OrderedDict()
+
+def _key(messages):
+    """Hash the tail of a prompt, which includes the fixed question."""
+    blob = json.dumps(messages[-6:], sort_keys=True).encode()
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+def _cache_get(key):
+    text = _resp_cache.get(key)
+    if text is not None:
+        _resp_cache.move_to_end(key)
+    return text
+
+def _cache_put(key, text):
+    if text == NO_RESPONSE:
+        return  # don't remember outages
+    _resp_cache[key] = text
+    _resp_cache.move_to_end(key)
+    while len(_resp_cache) > RESPONSE_CACHE_MAX:
+        _resp_cache.popitem(last=False)
+
+def cached_call_openai(messages, cacheable=False, response_format=None):
+    """call_openai, answering repeated cacheable prompts from _resp_cache."""
+    if not cacheable:
+        return call_openai(messages, response_format)
+    key = _key(messages)
+    text = _cache_get(key)
+    if text is None:
+        text = call_openai(messages, response_format)
+        _cache_put(key, text)
+    return text
+
+async def acached_call_openai(messages, cacheable=False, response_format=None):
+    """Async cached_call_openai."""
+    if not cacheable:
+        return await acall_openai(messages, response_format)
+    key = _key(messages)
+    text = _cache_get(key)
+    if text is None:
+        text = await acall_openai(messages, response_format)
+        _cache_put(key, text)
+    return text
+
+class _StreamPrinter:
+    """Echo streamed deltas in color and collect them for the history."""
+    def __init__(self, color):
+        self.color = color
+        self.parts = []
+        self.started = False
+        # Echo follows normalize_text: blank lines are held until text
+        # follows and then shown as at most one; whitespace opening a line
+        # is held until we know the line isn't blank.
+        self.in_line = False  # current line has visible text
+        self.blank_lines = 0  # blank lines since the last line with text
+        self.indent = ""
+        self.pending = ""  # possible start of an <NPC_META> tag, or its body
+        self.in_meta = False
+
+    def write(self, delta):
+        delta = delta.replace("\r", "")
+        self.parts.append(delta)
+        self._show(self._visible(delta))
+
+    def _visible(self, delta):
+        """Drop <NPC_META> tags from the echo, holding back a partial tag."""
+        text = self.pending + delta
+        shown = []
+        while text:
+            if self.in_meta:
+                end = text.find(NPC_META_CLOSE)
+                if end == -1:
+                    break
+                text = text[end + len(NPC_META_CLOSE):]
+                self.in_meta = False
+                continue
+            start = text.find(NPC_META_OPEN)
+            if start == -1:
+                cut = text.rfind("<")
+                if cut == -1 or not NPC_META_OPEN.startswith(text[cut:]):
+                    cut = len(text)
+                shown.append(text[:cut])
+                text = text[cut:]
+                break
+            shown.append(text[:start])
+            text = text[start + len(NPC_META_OPEN):]
+            self.in_meta = True
+        self.pending = text
+        return "".join(shown)
+
+    def _show(self, text):
+        out = []
+        for i, seg in enumerate(text.split("\n")):
+            if i:
+                # a line ends here
+                if self.in_line:
+                    self.blank_lines = 0
+                elif self.started:
+                    self.blank_lines += 1
+                self.in_line = False
+                self.indent = ""
+            if not seg:
+                continue
+            if self.in_line:
+                out.append(seg)
+            elif seg.isspace():
+                self.indent += seg
+            else:
+                if not self.started:
+                    out.append(self.color)
+                    self.started = True
+                else:
+                    out.append("\n\n" if self.blank_lines else "\n")
+                out.append(self.indent + seg)
+                self.indent = ""
+                self.in_line = True
+        if out:
+            sys.stdout.write("".join(out))
+            sys.stdout.flush()
+
+    def close(self):
+        """End the colored output; returns the normalized full text."""
+        if self.pending and not self.in_meta:
+            self._show(self.pending)
+        text = normalize_text(_take_npc_meta("".join(self.parts)))
+        if not self.started:
+            return None
+        sys.stdout.write(f"{RESET}\n")
+        sys.stdout.flush()
+        return text
+
+def _stream_failed(color):
+    print("[Error] Could not reach OpenAI API. Continuing with placeholder response.", file=sys.stderr)
+    print(f"{color}{NO_RESPONSE}{RESET}")
+    return NO_RESPONSE
+
+def call_openai_stream(messages, color=BLUE):
+    """Like call_openai, but prints the reply as it streams in.
+
+    Returns the normalized reply for appending to history.
+    """
+    for attempt in range(API_ATTEMPTS):
+        out = _StreamPrinter(color)
+        try:
+            stream = client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                temperature=0.8,
+                max_tokens=500,
+                top_p=0.9,
+                stream=True,
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    out.write(chunk.choices[0].delta.content)
+            return out.close() or ""
+        except Exception as e:
+            text = out.close()
+            if text:
+                # part of the reply is already on screen; keep it
+                return text
+            wait = _retry_delay(e, attempt)
+            if wait is None:
+                break
+            time.sleep(wait)
+    return _stream_failed(color)
+
+async def acall_openai_stream(messages, color=BLUE):
+    """Async call_openai_stream, to run alongside other requests."""
+    for attempt in range(API_ATTEMPTS):
+        out = _StreamPrinter(color)
+        try:
+            stream = await aclient.chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                temperature=0.8,
+                max_tokens=500,
+                top_p=0.9,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    out.write(chunk.choices[0].delta.content)
+            return out.close() or ""
+        except Exception as e:
+            text = out.close()
+            if text:
+                return text
+            wait = _retry_delay(e, attempt)
+            if wait is None:
+                break
+            await asyncio.sleep(wait)
+    return _stream_failed(color)
+
+def run_concurrently(*coros):
+    """Run coroutines together on the session loop; returns their results."""
+    async def gather():
+        return await asyncio.gather(*coros)
+    return _loop.run_until_complete(gather())
 
 def print_help():
     print("""
@@ -281,36 +875,26 @@ Available commands:
 
 def list_npcs(history):
     """Ask Realmweaver to list current NPC names in the scene."""
-    prompt = history + [
-        {"role":"user", "content":
-            "List, in a comma-separated list, the FULL NAMES of all NPCs currently "
-            "present in this scene. If none, reply 'None'."}
-    ]
-    raw = call_openai(prompt)
-    # Parse comma-separated names, stripping punctuation, ignore 'none'
-    npc_list = []
-    for entry in raw.split(','):
-        name = entry.strip().strip(".!?:;")
-        if name and name.lower() != "none":
-            npc_list.append(name)
-    return npc_list
+    prompt = build_messages(history,
+        "List, in a comma-separated list, the FULL NAMES of all NPCs currently "
+        "present in this scene. If none, reply 'None'.")
+    raw = cached_call_openai(prompt, cacheable=True)
+    return _parse_list(raw)
 
 def start_conversation(npc_name, history):
     """
     Start a first-person back-and-forth with npc_name.
     On first encounter, fetch and store their bio + backstory.
     """
-    # If we don't have this NPC's data yet, prompt for it
+    # Usually filled from the introduction's <NPC_META>; otherwise ask for it
     if npc_name not in npc_data:
         # Ask for bio and backstory in one shot
-        summary_prompt = history[-6:] + [
-            {"role":"user", "content":
-                f"You previously described an NPC named '{npc_name}'.\n"
-                "Please provide TWO clearly labeled sections:\n"
-                "BIO: One sentence describing who they are (name/title/role).\n"
-                "BACKSTORY: Two sentences about their past, interests, or beliefs.\n"
-                "Respond exactly in this format."}
-        ]
+        summary_prompt = build_messages(history[-6:],
+            f"You previously described an NPC named '{npc_name}'.\n"
+            "Please provide TWO clearly labeled sections:\n"
+            "BIO: One sentence describing who they are (name/title/role).\n"
+            "BACKSTORY: Two sentences about their past, interests, or beliefs.\n"
+            "Respond exactly in this format.")
         summary = call_openai(summary_prompt)
         # Parse the two sections
         bio, backstory = "", ""
@@ -323,6 +907,7 @@ def start_conversation(npc_name, history):
         if not bio: bio = f"{npc_name}, a person of note."
         if not backstory: backstory = "They prefer to keep much of their past private."
         npc_data[npc_name] = {"bio": bio, "backstory": backstory}
+        _invalidate_completions()
 
     # Build a strict system prompt for the NPC chat
     info = npc_data[npc_name]
@@ -359,6 +944,10 @@ def start_conversation(npc_name, history):
 # MAIN GAME LOOP
 # ----------------------------------------------------------------
 
+# Command patterns; group 1 is the destination / examined object
+_MOVE_RE = re.compile(r"(?:go|move|travel) to\s+(.+)", re.I)
+_EXAMINE_RE = re.compile(r"(?:examine|look at|inspect)\s+(.+)", re.I)
+
 def main():
     global prune_enabled  # allow toggling summarization on/off
     # Game menu: New or Load
@@ -387,18 +976,16 @@ def main():
             start_ctx = "Year 1372, in the misty Isle of Everdawn"
         print(f"\n{BLUE}…Very well. Setting the scene…{RESET}\n")
         history = [
-            {"role":"system",  "content":SYSTEM_PROMPT},
             {"role":"user",    "content":f"Begin the adventure: {start_ctx}."}
         ]
-        intro = call_openai(history)
-        intro = normalize_text(intro)
-        print(f"{BLUE}{intro}{RESET}")
+        intro = call_openai_stream(build_messages(history))
         history.append({"role":"assistant","content":intro})
         # initialize first scene description and location
         player_state["current_location"] = start_ctx
         scene_descriptions[start_ctx] = intro
         if start_ctx not in player_state["visited_locations"]:
             player_state["visited_locations"].append(start_ctx)
+            _invalidate_completions()
         print_help()
 
     while True:
@@ -482,27 +1069,38 @@ def main():
                     for line in desc.splitlines():
                         print(f"  {line}")
                 continue
-            # recursive ASCII tree with cycle guard
-            def draw(node, parent=None, prefix="", is_last=True, visited=None):
-                # initialize or update visited set
-                if visited is None:
-                    visited = {node}
-                    print(f"{prefix}{node}")
-                else:
-                    branch = "└─ " if is_last else "├─ "
-                    print(f"{prefix}{branch}{node}")
-                    visited.add(node)
-                # children are neighbors except parent and already visited
-                children = sorted(graph.get(node, []))
-                if parent in children:
-                    children.remove(parent)
-                for idx, child in enumerate(children):
-                    if child in visited:
+            # reuse the rendered tree until the graph changes
+            version = player_state.get("_graph_version", 0)
+            cached_version, tree = _map_cache.get(target, (None, None))
+            if cached_version != version:
+                lines = []
+                # depth-first ASCII tree with cycle guard, using an explicit
+                # stack of (node, parent, prefix, is_last, is_root)
+                visited = set()
+                stack = [(target, None, "", True, True)]
+                while stack:
+                    node, parent, prefix, is_last, is_root = stack.pop()
+                    if node in visited:
                         continue
-                    is_last_child = (idx == len(children) - 1)
+                    visited.add(node)
+                    if is_root:
+                        lines.append(f"{prefix}{node}")
+                    else:
+                        branch = "└─ " if is_last else "├─ "
+                        lines.append(f"{prefix}{branch}{node}")
+                    # children are neighbors except parent; ones visited by then are
+                    # skipped when popped, exactly as the recursive version did
+                    children = sorted(graph.get(node, []))
+                    if parent in children:
+                        children.remove(parent)
                     new_prefix = prefix + ("   " if is_last else "│  ")
-                    draw(child, node, new_prefix, is_last_child, visited)
-            draw(target)
+                    # push in reverse so the first child is drawn first
+                    for idx in range(len(children) - 1, -1, -1):
+                        stack.append((children[idx], node, new_prefix, idx == len(children) - 1, False))
+                tree = "\n".join(lines)
+                # one entry per location: a newer tree replaces the stale one
+                _map_cache[target] = (version, tree)
+            print(tree)
             # show stored scene description if available
             if desc:
                 print(f"\n{GREEN}Details for '{target}':{RESET}")
@@ -512,19 +1110,19 @@ def main():
         # Hint
         if lc == "hint":
             loc = player_state.get("current_location","")
-            hint_prompt = history + [{"role":"user","content":f"I'm stuck at {loc}. Please give me a hint."}]
-            hint = call_openai(hint_prompt)
-            hint = normalize_text(hint)
-            print(f"{YELLOW}Hint:{RESET} {hint}")
+            hint_prompt = build_messages(history, f"I'm stuck at {loc}. Please give me a hint.")
+            print(f"{YELLOW}Hint:{RESET} ", end="")
+            call_openai_stream(hint_prompt, color="")
             continue
         # Roll dice: roll <stat> [DC]
         if lc.startswith("roll"):
             parts = cmd.split()
             if len(parts)>=2:
                 stat = parts[1].upper()
-                if stat in player_state["stats"]:
-                    mod = (player_state["stats"][stat]-10)//2
-                    roll = random.randint(1,20) + mod
+                mods = player_state["_mods"]
+                if stat in mods:
+                    mod = mods[stat]
+                    roll = _rng.randint(1,20) + mod
                     result = f"Rolled 1d20 + {mod} = {roll}"
                     if len(parts)>=3 and parts[2].isdigit():
                         dc = int(parts[2])
@@ -558,36 +1156,30 @@ def main():
         # Describe surroundings
         if lc in ("look","observe","where"):
             history.append({"role":"user","content":cmd})
-            desc = call_openai(history)
-            desc = normalize_text(desc)
-            print(f"\n{BLUE}{desc}{RESET}")
+            # describe the scene and list its contents at the same time
+            print()
+            desc, env = run_concurrently(acall_openai_stream(build_messages(history)), adescribe_environment(history))
             history.append({"role":"assistant","content":desc})
-            print_environment_summary(history)
+            print_environment_summary(history, env)
             continue
         # Examine/look commands
-        if any(lc.startswith(w) for w in ("examine ","look at ","inspect ")):
-            parts = cmd.split(maxsplit=1)
-            if len(parts)>=2:
-                target = parts[1]
-                history.append({"role":"user","content":cmd})
-                desc = call_openai(history)
-                desc = normalize_text(desc)
-                print(f"{BLUE}{desc}{RESET}")
-                items_data[target] = desc
-                player_state["journal"].append(f"Examined {target}.")
-                history.append({"role":"assistant","content":desc})
-            else:
-                print("Usage: examine <object>")
+        m = _EXAMINE_RE.match(cmd)
+        if m:
+            target = m.group(1)
+            history.append({"role":"user","content":cmd})
+            desc = call_openai_stream(build_messages(history))
+            items_data[target] = desc
+            _invalidate_completions()
+            player_state["journal"].append(f"Examined {target}.")
+            history.append({"role":"assistant","content":desc})
             continue
         # Movement commands
         moved = False
-        for prefix in ("go to ", "move to ", "travel to "):
-            if lc.startswith(prefix):
-                dest = cmd[len(prefix):].strip()
-                # normalize location names (title case)
-                dest = dest.title()
-                moved = True
-                break
+        m = _MOVE_RE.match(cmd)
+        if m:
+            # normalize location names (title case)
+            dest = m.group(1).title()
+            moved = True
         if not moved and lc in ("north","south","east","west"):
             dest = lc
             # normalize direction names
@@ -596,26 +1188,31 @@ def main():
         if moved:
             prev = player_state.get("current_location")
             if prev:
-                player_state["map_graph"].setdefault(prev, set()).add(dest)
-                player_state["map_graph"].setdefault(dest, set()).add(prev)
+                # neighbor lists (not sets) so save_game can json.dump them
+                graph = player_state["map_graph"]
+                for a, b in ((prev, dest), (dest, prev)):
+                    nbrs = graph.setdefault(a, [])
+                    if b not in nbrs:
+                        nbrs.append(b)
+                        player_state["_graph_version"] = player_state.get("_graph_version", 0) + 1
             # move player and record visit
             player_state["current_location"] = dest
             if dest not in player_state["visited_locations"]:
                 player_state["visited_locations"].append(dest)
+                _invalidate_completions()
             history.append({"role":"user","content":cmd})
-            resp = call_openai(history)
-            resp = normalize_text(resp)
-            print(f"\n{BLUE}{resp}{RESET}")
+            print()
+            resp = call_openai_stream(build_messages(history))
             history.append({"role":"assistant","content":resp})
             # store scene description for this location
             scene_descriptions[dest] = resp
+            # list the contents only now, so they match the new description
             print_environment_summary(history)
             continue
         # All other: forward to Realmweaver
         history.append({"role":"user","content":cmd})
-        resp = call_openai(history)
-        resp = normalize_text(resp)
-        print(f"\n{BLUE}{resp}{RESET}")
+        print()
+        resp = call_openai_stream(build_messages(history))
         history.append({"role":"assistant","content":resp})
 
 if __name__ == "__main__":